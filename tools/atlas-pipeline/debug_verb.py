@@ -1,25 +1,30 @@
-import xml.etree.ElementTree as ET
+from lxml import etree as ET
 
 filepath = "elwiktionary-latest-pages-articles.xml"
+PAGE_TAG = "{http://www.mediawiki.org/xml/export-0.11/}page"
+REVISION_TAG = "{http://www.mediawiki.org/xml/export-0.11/}revision"
+TEXT_TAG = "{http://www.mediawiki.org/xml/export-0.11/}text"
 target_word = "λύνω"
 
 print(f"🚀 Searching for '{target_word}' in {filepath}...")
 
-context = ET.iterparse(filepath, events=("end",))
+context = ET.iterparse(filepath, events=("end",), tag=PAGE_TAG, huge_tree=True)
 for event, elem in context:
-    if elem.tag.endswith("page"):
-        title = elem.findtext("{http://www.mediawiki.org/xml/export-0.11/}title")
+    # <title> is always the first child of <page> in MediaWiki dumps
+    title = elem[0].text
+    
+    if title == target_word:
+        print(f"✅ Found '{title}'")
+        revision = elem.find(REVISION_TAG)
+        text = revision.findtext(TEXT_TAG) if revision is not None else ""
         
-        if title == target_word:
-            print(f"✅ Found '{title}'")
-            revision = elem.find("{http://www.mediawiki.org/xml/export-0.11/}revision")
-            text = revision.findtext("{http://www.mediawiki.org/xml/export-0.11/}text") if revision is not None else ""
-            
-            print(f"Text length: {len(text)}")
-            print("-" * 20)
-            print(text)
-            print("-" * 20)
-            
-            break
+        print(f"Text length: {len(text)}")
+        print("-" * 20)
+        print(text)
+        print("-" * 20)
         
-        elem.clear()
+        break
+    
+    elem.clear(keep_tail=False)
+    while elem.getprevious() is not None:
+        del elem.getparent()[0]
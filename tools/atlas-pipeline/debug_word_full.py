@@ -1,10 +1,10 @@
-import mwparserfromhell
-import xml.etree.ElementTree as ET
+from lxml import etree as ET
 import sys
 import yaml
 import glob
 import os
 from models import Lemma, Paradigm, Gender, ParadigmConfig
+from wiktionary import TEMPLATE_RE
 
 class ConfigLoader:
     def __init__(self, data_dir: str):
@@ -46,6 +46,9 @@ class ConfigLoader:
         print(f"DEBUG: Template Map Keys (first 10): {list(self.template_map.keys())[:10]}")
 
 filepath = "elwiktionary-latest-pages-articles.xml"
+PAGE_TAG = "{http://www.mediawiki.org/xml/export-0.11/}page"
+REVISION_TAG = "{http://www.mediawiki.org/xml/export-0.11/}revision"
+TEXT_TAG = "{http://www.mediawiki.org/xml/export-0.11/}text"
 target_word = "παλιομερολογίτισσα"
 config_dir = "data/morphology"
 
@@ -54,32 +57,32 @@ config = ConfigLoader(config_dir)
 
 print(f"🚀 Searching for '{target_word}' in {filepath}...")
 
-context = ET.iterparse(filepath, events=("end",))
+context = ET.iterparse(filepath, events=("end",), tag=PAGE_TAG, huge_tree=True)
 for event, elem in context:
-    if elem.tag.endswith("page"):
-        title = elem.findtext("{http://www.mediawiki.org/xml/export-0.11/}title")
+    # <title> is always the first child of <page> in MediaWiki dumps
+    title = elem[0].text
+    
+    if title == target_word:
+        print(f"✅ Found '{title}'")
+        revision = elem.find(REVISION_TAG)
+        text = revision.findtext(TEXT_TAG) if revision is not None else ""
         
-        if title == target_word:
-            print(f"✅ Found '{title}'")
-            revision = elem.find("{http://www.mediawiki.org/xml/export-0.11/}revision")
-            text = revision.findtext("{http://www.mediawiki.org/xml/export-0.11/}text") if revision is not None else ""
-            
-            wikicode = mwparserfromhell.parse(text)
-            templates = wikicode.filter_templates()
-            for t in templates:
-                name = str(t.name).strip()
-                if name.startswith("el-κλίση"):
-                    print(f"TEMPLATE FOUND: '{name}'")
-                    
-                    if name in config.template_map:
-                        pid = config.template_map[name]
-                        print(f"✅ MATCHED! Paradigm ID: {pid}")
-                        p = config.paradigms[pid]
-                        print(f"Paradigm: {p}")
-                    else:
-                        print(f"❌ NO MATCH in template_map")
-                        print(f"Keys available: {list(config.template_map.keys())}")
-            
-            break
+        for m in TEMPLATE_RE.finditer(text):
+            name = m.group(1).strip()
+            if name.startswith("el-κλίση"):
+                print(f"TEMPLATE FOUND: '{name}'")
+                
+                if name in config.template_map:
+                    pid = config.template_map[name]
+                    print(f"✅ MATCHED! Paradigm ID: {pid}")
+                    p = config.paradigms[pid]
+                    print(f"Paradigm: {p}")
+                else:
+                    print(f"❌ NO MATCH in template_map")
+                    print(f"Keys available: {list(config.template_map.keys())}")
         
-        elem.clear()
+        break
+    
+    elem.clear(keep_tail=False)
+    while elem.getprevious() is not None:
+        del elem.getparent()[0]
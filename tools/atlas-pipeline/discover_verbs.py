@@ -1,36 +1,35 @@
-import mwparserfromhell
-import xml.etree.ElementTree as ET
+from lxml import etree as ET
 import collections
+from wiktionary import TEMPLATE_RE
 
 filepath = "elwiktionary-latest-pages-articles.xml"
+PAGE_TAG = "{http://www.mediawiki.org/xml/export-0.11/}page"
+REVISION_TAG = "{http://www.mediawiki.org/xml/export-0.11/}revision"
+TEXT_TAG = "{http://www.mediawiki.org/xml/export-0.11/}text"
 
 print(f"🚀 Discovering verb templates in {filepath}...")
 
-template_counts = collections.Counter()
+template_counts = collections.defaultdict(int)
 count = 0
 
-context = ET.iterparse(filepath, events=("end",))
+context = ET.iterparse(filepath, events=("end",), tag=PAGE_TAG, huge_tree=True)
 for event, elem in context:
-    if elem.tag.endswith("page"):
-        title = elem.findtext("{http://www.mediawiki.org/xml/export-0.11/}title")
-        revision = elem.find("{http://www.mediawiki.org/xml/export-0.11/}revision")
-        text = revision.findtext("{http://www.mediawiki.org/xml/export-0.11/}text") if revision is not None else ""
+    revision = elem.find(REVISION_TAG)
+    text = revision.findtext(TEXT_TAG) if revision is not None else ""
+    
+    # Check for Verb tag
+    if "{{ρήμα|el" in text:
+        for m in TEMPLATE_RE.finditer(text):
+            template_counts[m.group(1).strip()] += 1
+    
+    count += 1
+    if count % 10000 == 0:
+        print(f"Scanned {count} pages...", end='\r')
         
-        # Check for Verb tag
-        if "{{ρήμα|el" in text:
-            wikicode = mwparserfromhell.parse(text)
-            templates = wikicode.filter_templates()
-            for t in templates:
-                name = str(t.name).strip()
-                if name.startswith("el-κλίση") or name.startswith("el-κλίσ-"):
-                    template_counts[name] += 1
-        
-        count += 1
-        if count % 10000 == 0:
-            print(f"Scanned {count} pages...", end='\r')
-            
-        elem.clear()
+    elem.clear(keep_tail=False)
+    while elem.getprevious() is not None:
+        del elem.getparent()[0]
 
 print("\n✅ Discovery complete. Top 50 verb templates:")
-for template, freq in template_counts.most_common(50):
+for template, freq in collections.Counter(template_counts).most_common(50):
     print(f"{template}: {freq}")
@@ -1,8 +1,9 @@
 import json
+import orjson
 import sys
 import os
 from pathlib import Path
-from models import Dictionary, Lemma, Gender, Paradigm
+from models import LemmaFast, Gender, Paradigm
 from wiktionary import WiktionaryParser
 
 def main():
@@ -70,27 +71,34 @@ def main():
             ]
         )
         
-        lemmas.append(Lemma(id=101, text="άνθρωπ", gender=Gender.Masculine))
-        lemmas.append(Lemma(id=999, text="ο", gender=Gender.Masculine))
-        lemmas.append(Lemma(id=1000, text="τ", gender=Gender.Masculine))
+        lemmas.append(LemmaFast(id=101, text="άνθρωπ", gender=Gender.Masculine))
+        lemmas.append(LemmaFast(id=999, text="ο", gender=Gender.Masculine))
+        lemmas.append(LemmaFast(id=1000, text="τ", gender=Gender.Masculine))
         
         paradigms.extend([p_noun_os, p_article_o, p_article_t])
 
-    # 3. Compile Dictionary
-    data = Dictionary(
-        version=1,
-        lemmas=lemmas,
-        paradigms=paradigms
-    )
-
-    # 2. Export to JSON
+    # 3. Export to JSON
     # We save this to the root or a temp folder for the Rust compiler
     output_path = Path("dictionary_intermediate.json")
+    write_dictionary(output_path, lemmas, paradigms)
     
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(data.model_dump_json(indent=2))
-    
-    print(f"✅ Exported {len(data.lemmas)} lemmas and {len(data.paradigms)} paradigms to {output_path}")
+    print(f"✅ Exported {len(lemmas)} lemmas and {len(paradigms)} paradigms to {output_path}")
+
+def write_dictionary(output_path: Path, lemmas: list[LemmaFast], paradigms: list[Paradigm], version: int = 1):
+    """
+    Streams a Dictionary-shaped JSON document one record per line,
+    so the full document never exists in memory as a single string.
+    """
+    with open(output_path, "wb") as f:
+        f.write(b'{"version":%d,"lemmas":[' % version)
+        for i, lemma in enumerate(lemmas):
+            f.write(b",\n" if i else b"\n")
+            f.write(orjson.dumps(lemma)) # orjson serializes dataclasses natively
+        f.write(b'\n],"paradigms":[')
+        for i, paradigm in enumerate(paradigms):
+            f.write(b",\n" if i else b"\n")
+            f.write(orjson.dumps(paradigm.model_dump()))
+        f.write(b"\n]}\n")
 
 if __name__ == "__main__":
     main()
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from enum import Enum
 from pydantic import BaseModel
 
@@ -24,6 +25,16 @@ class Lemma(BaseModel):
     gender: Gender
     pos: PartOfSpeech = PartOfSpeech.Noun # Default for backward compatibility during migration
 
+@dataclass(slots=True)
+class LemmaFast:
+    """
+    Unvalidated Lemma for the ingestion hot path. Serialized field-for-field like Lemma.
+    """
+    id: int
+    text: str
+    gender: Gender
+    pos: PartOfSpeech = PartOfSpeech.Noun
+
 class Paradigm(BaseModel):
     id: int
     # List of (MorphFlags as int, Suffix string)
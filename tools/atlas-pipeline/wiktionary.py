@@ -1,23 +1,67 @@
-import mwparserfromhell
-import xml.etree.ElementTree as ET
+import collections
+from lxml import etree as ET
 import logging
+import multiprocessing
 import yaml
 import glob
 import os
+import pickle
+import queue
+import re
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from typing import Generator, Optional
-from models import Lemma, Paradigm, Gender, ParadigmConfig, PartOfSpeech
+import models
+from models import LemmaFast, Paradigm, Gender, ParadigmConfig, PartOfSpeech
+
+PAGE_TAG = "{http://www.mediawiki.org/xml/export-0.11/}page"
+REVISION_TAG = "{http://www.mediawiki.org/xml/export-0.11/}revision"
+TEXT_TAG = "{http://www.mediawiki.org/xml/export-0.11/}text"
+
+# Matches the name of an inflection template ({{el-κλίση-...}} / {{el-κλίσ-...}})
+# without building a full wikitext AST for the page.
+TEMPLATE_RE = re.compile(r"\{\{\s*(el-κλίσ[η\-][^|}\n]*)")
+
+# Pages handed to a pool worker per task
+BATCH_SIZE = 256
+
+# Batches parsed ahead of the consumer by the XML reader thread
+READ_AHEAD_BATCHES = 4
+
+# Pickled (paradigms, template_map, suffix_map), reused while no YAML file
+# or loader source (this module, models.py) is newer
+CONFIG_CACHE = ".cache.pkl"
+
+# Key marking a complete suffix in a reversed-suffix trie node (holds the suffix length)
+SUFFIX_END = ""
 
 class ConfigLoader:
     def __init__(self, data_dir: str):
         self.paradigms: dict[int, Paradigm] = {}
         self.template_map: dict[str, int] = {}
         self.suffix_map: list[tuple[str, Gender | None, int]] = [] # (suffix, gender, id)
+        self.suffix_trie_by_pid: dict[int, dict] = {} # paradigm id -> trie over reversed suffixes
         self.load(data_dir)
 
     def load(self, data_dir: str):
         print(f"📂 Loading morphology config from {data_dir}...")
+        if not os.path.isdir(data_dir):
+            print(f"⚠️  Morphology config directory {data_dir} not found (run from tools/atlas-pipeline). No paradigms loaded.")
+            return
+        
         files = glob.glob(os.path.join(data_dir, "*.yaml"))
+        cache_path = os.path.join(data_dir, CONFIG_CACHE)
+        
+        # The directory mtime also changes when a YAML file is added or removed.
+        # The loader sources are included so code changes never reuse stale objects.
+        sources = [data_dir, __file__, models.__file__] + files
+        config_mtime = max(os.path.getmtime(f) for f in sources)
+        if self.load_cache(cache_path, config_mtime):
+            self.build_suffix_tries()
+            print(f"✅ Loaded {len(self.paradigms)} paradigms (cached).")
+            return
+        
         for file in files:
             with open(file, 'r', encoding='utf-8') as f:
                 data = yaml.safe_load(f)
@@ -28,9 +72,10 @@ class ConfigLoader:
                     config = ParadigmConfig(**p_data)
                     
                     # Create Runtime Paradigm
+                    # Suffixes repeat across paradigms, so intern them to share one object each
                     paradigm = Paradigm(
                         id=config.id,
-                        endings=[(e.flags, e.suffix) for e in config.endings]
+                        endings=[(e.flags, sys.intern(e.suffix)) for e in config.endings]
                     )
                     self.paradigms[config.id] = paradigm
                     
@@ -40,37 +85,93 @@ class ConfigLoader:
                             self.template_map[trigger.template] = config.id
                         if trigger.suffix:
                             # Sort by length descending later to match longest suffix first
-                            self.suffix_map.append((trigger.suffix, trigger.gender, config.id))
+                            self.suffix_map.append((sys.intern(trigger.suffix), trigger.gender, config.id))
         
         # Sort suffix map by length descending to ensure specific matches first
         self.suffix_map.sort(key=lambda x: len(x[0]), reverse=True)
+        self.build_suffix_tries()
+        self.save_cache(cache_path)
         print(f"✅ Loaded {len(self.paradigms)} paradigms.")
 
+    def load_cache(self, cache_path: str, config_mtime: float) -> bool:
+        """
+        Restores the parsed config from the pickle cache if it is at least as new as the YAML files.
+        """
+        try:
+            if os.path.getmtime(cache_path) < config_mtime:
+                return False
+            with open(cache_path, 'rb') as f:
+                self.paradigms, self.template_map, self.suffix_map = pickle.load(f)
+            return True
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, AttributeError, ImportError):
+            return False
+
+    def save_cache(self, cache_path: str):
+        try:
+            with open(cache_path, 'wb') as f:
+                pickle.dump((self.paradigms, self.template_map, self.suffix_map), f, protocol=5)
+        except OSError as e:
+            print(f"⚠️  Could not write config cache {cache_path}: {e}")
+
+    def build_suffix_tries(self):
+        """
+        Indexes suffix_map per paradigm as tries over reversed suffixes,
+        so the longest matching suffix is found in a single walk from the end of a word.
+        """
+        self.suffix_trie_by_pid = {}
+        for suffix, _, pid in self.suffix_map:
+            node = self.suffix_trie_by_pid.setdefault(pid, {})
+            for ch in reversed(suffix):
+                node = node.setdefault(ch, {})
+            node[SUFFIX_END] = len(suffix)
+
+# Parser shared by pool workers, set once per worker process by _init_worker
+_worker_parser: Optional["WiktionaryParser"] = None
+
+def _init_worker(parser: "WiktionaryParser"):
+    global _worker_parser
+    _worker_parser = parser
+
+def _process_batch(batch: list[tuple[str, str]]) -> list[tuple[str, str, Gender, PartOfSpeech, int]]:
+    """
+    Runs process_page over a batch of (title, text) pages in a worker process.
+    Returns (title, stem, gender, pos, paradigm_id) for each accepted page.
+    """
+    results = []
+    for title, text in batch:
+        result = _worker_parser.process_page(title, text)
+        if result:
+            results.append((title, *result))
+    return results
+
 class WiktionaryParser:
     def __init__(self, filepath: str, config_dir: str = "data/morphology"):
         self.filepath = filepath
         self.config = ConfigLoader(config_dir)
+        self._next_id = 1 # Monotonic lemma id, unique across the whole run
 
     def stream_pages(self) -> Generator[dict, None, None]:
         """
         Yields pages as dicts: {'title': str, 'text': str}
         """
-        context = ET.iterparse(self.filepath, events=("end",))
+        context = ET.iterparse(self.filepath, events=("end",), tag=PAGE_TAG, huge_tree=True)
         for event, elem in context:
-            if elem.tag.endswith("page"):
-                title = elem.findtext("{http://www.mediawiki.org/xml/export-0.11/}title")
-                revision = elem.find("{http://www.mediawiki.org/xml/export-0.11/}revision")
-                text = revision.findtext("{http://www.mediawiki.org/xml/export-0.11/}text") if revision is not None else ""
-                
-                yield {"title": title, "text": text}
-                elem.clear()
+            # <title> is always the first child of <page>; <revision> follows optional siblings
+            title = elem[0].text
+            revision = elem.find(REVISION_TAG)
+            text = revision.findtext(TEXT_TAG) if revision is not None else ""
+            
+            yield {"title": title, "text": text}
+            
+            # Free the page and any already-processed siblings still held by the root
+            elem.clear(keep_tail=False)
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
 
-    def parse_inflection_template(self, template, gender: Gender = Gender.Masculine) -> Optional[Paradigm]:
+    def parse_inflection_template(self, name: str, gender: Gender = Gender.Masculine) -> Optional[Paradigm]:
         """
-        Data-driven mapper: Converts a raw Wiktionary template into a Logos Paradigm.
+        Data-driven mapper: Converts a Wiktionary template name into a Logos Paradigm.
         """
-        name = str(template.name).strip()
-        
         # 1. Exact Template Match
         if name in self.config.template_map:
             pid = self.config.template_map[name]
@@ -82,104 +183,190 @@ class WiktionaryParser:
         """
         Derives the stem based on the paradigm's suffix triggers.
         """
-        # Find the suffix that triggered this paradigm
-        # We search the suffix_map for this ID
-        candidates = [s for s, g, pid in self.config.suffix_map if pid == paradigm_id]
+        # Find the longest suffix that triggered this paradigm
+        # by walking its reversed-suffix trie from the end of the word
+        node = self.config.suffix_trie_by_pid.get(paradigm_id)
+        depth = 0
+        if node is not None:
+            for ch in reversed(word):
+                node = node.get(ch)
+                if node is None:
+                    break
+                depth = node.get(SUFFIX_END, depth)
         
-        for suffix in candidates:
-            if word.endswith(suffix):
-                return word[:-len(suffix)]
+        if depth:
+            return word[:-depth]
         
         # Fallback: Try to guess based on common endings if explicit trigger not found
         # (This handles cases where template matched but suffix trigger wasn't explicit in config)
         # For now, let's assume the config is good.
         return None
 
-    def process(self, limit: int = None) -> tuple[list[Lemma], list[Paradigm]]:
+    def process_page(self, title: str, text: str) -> Optional[tuple[str, Gender, PartOfSpeech, int]]:
+        """
+        Classifies a single page. Returns (stem, gender, pos, paradigm_id) for Greek lemmas
+        with a known inflection template, None otherwise.
+        """
+        # Skip non-Greek entries (Relaxed check)
+        # We rely on the POS tag to confirm it's Greek
+        is_noun = "{{ουσιαστικό|el" in text
+        is_adj = "{{επίθετο|el" in text
+        is_verb = "{{ρήμα|el" in text
+        
+        if not (is_noun or is_adj or is_verb):
+            return None
+
+        # Determine POS and Gender
+        lemma_pos = PartOfSpeech.Noun
+        lemma_gender = Gender.Masculine # Default
+        
+        if is_verb:
+            lemma_pos = PartOfSpeech.Verb
+            lemma_gender = Gender.Neuter # Verbs don't have gender, but struct requires it. Use Neuter as placeholder? Or maybe make Gender optional in Lemma?
+            # For now, let's use Neuter for verbs as a convention or update Lemma to make gender optional.
+            # Rust struct has Gender, so we must provide one.
+        elif is_adj:
+            lemma_pos = PartOfSpeech.Adjective
+            # Adjectives usually have gender in header too, but often just {{επίθετο|el}}
+        elif is_noun:
+            lemma_pos = PartOfSpeech.Noun
+            if "{{ουσιαστικό|el|θηλ}}" in text or "{{θηλυκό}}" in text:
+                lemma_gender = Gender.Feminine
+            elif "{{ουσιαστικό|el|ουδ}}" in text or "{{ουδέτερο}}" in text:
+                lemma_gender = Gender.Neuter
+        
+        # Extract inflection template names
+        lemma_paradigm = None
+        
+        # TEMPLATE_RE only matches el-κλίση* / el-κλίσ-* names
+        for m in TEMPLATE_RE.finditer(text):
+            p = self.parse_inflection_template(m.group(1).strip(), lemma_gender)
+            if p:
+                lemma_paradigm = p
+                break # Found the inflection template
+        
+        if not lemma_paradigm:
+            return None
+
+        # Extract Stem using Data-Driven Logic
+        stem = self.get_stem(title, lemma_paradigm.id)
+        
+        # Fallback for Adjectives or complex cases if get_stem fails
+        if not stem:
+            # Heuristic: If it's an adjective, try removing common endings
+            if title.endswith("ος"): stem = title[:-2]
+            elif title.endswith("η"): stem = title[:-1]
+            elif title.endswith("ο"): stem = title[:-1]
+            elif title.endswith("ω"): stem = title[:-1] # Verb fallback
+            else: stem = title # Dangerous fallback
+        
+        return stem, lemma_gender, lemma_pos, lemma_paradigm.id
+
+    def read_batches(self) -> Generator[list[tuple[str, str]], None, None]:
+        """
+        Groups streamed pages into (title, text) batches for the worker pool.
+        """
+        batch = []
+        total_scanned = 0
+        for page in self.stream_pages():
+            total_scanned += 1
+            if total_scanned % 10000 == 0:
+                print(f"DEBUG: Scanned {total_scanned} pages... Current: '{page['title']}'", end='\r')
+                sys.stdout.flush()
+
+            batch.append((page["title"], page["text"]))
+            if len(batch) == BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def stream_batches(self) -> Generator[list[tuple[str, str]], None, None]:
+        """
+        Runs read_batches on a reader thread behind a bounded queue,
+        so XML parsing overlaps with the consumer's work.
+        """
+        batches = queue.Queue(maxsize=READ_AHEAD_BATCHES)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            # Give up once the consumer has stopped, instead of blocking on a full queue forever
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def reader():
+            try:
+                for batch in self.read_batches():
+                    if not put(batch):
+                        return
+                put(None)
+            except Exception as e:
+                put(e) # Re-raised on the consumer side
+
+        threading.Thread(target=reader, daemon=True).start()
+        try:
+            while (item := batches.get()) is not None:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+
+    def process(self, limit: int = None) -> tuple[list[LemmaFast], list[Paradigm]]:
         lemmas = []
         paradigms = {} # Store unique paradigms used
         count = 0
-        total_scanned = 0
+        workers = os.cpu_count() or 1
         
-        print(f"🚀 Starting ingestion from {self.filepath}...")
+        print(f"🚀 Starting ingestion from {self.filepath} with {workers} workers...")
         
-        try:
-            for page in self.stream_pages():
+        # Fork lets workers inherit the loaded config instead of unpickling it
+        mp_context = multiprocessing.get_context("fork") if sys.platform == "linux" else None
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(self,),
+        )
+        # Bound the number of in-flight batches so the dump is never buffered in memory
+        pending = collections.deque()
+        
+        def drain_one():
+            nonlocal count
+            for title, stem, gender, pos, pid in pending.popleft().result():
+                paradigms[pid] = self.config.paradigms[pid]
+                lemmas.append(LemmaFast(id=self._next_id, text=stem, gender=gender, pos=pos))
+                self._next_id += 1
+                count += 1
+                if count % 100 == 0:
+                    print(f"✅ Processed {count} words...{title}...", end='\r')
                 if limit and count >= limit:
-                    break
-                
-                total_scanned += 1
-                title = page["title"]
-                text = page["text"]
-                
-                if total_scanned % 10000 == 0:
-                    print(f"DEBUG: Scanned {total_scanned} pages... Current: '{title}'", end='\r')
-                    sys.stdout.flush()
-
-                # Skip non-Greek entries (Relaxed check)
-                # We rely on the POS tag to confirm it's Greek
-                is_noun = "{{ουσιαστικό|el" in text
-                is_adj = "{{επίθετο|el" in text
-                is_verb = "{{ρήμα|el" in text
-                
-                if not (is_noun or is_adj or is_verb):
-                    continue
-
-                # Determine POS and Gender
-                lemma_pos = PartOfSpeech.Noun
-                lemma_gender = Gender.Masculine # Default
-                
-                if is_verb:
-                    lemma_pos = PartOfSpeech.Verb
-                    lemma_gender = Gender.Neuter # Verbs don't have gender, but struct requires it. Use Neuter as placeholder? Or maybe make Gender optional in Lemma?
-                    # For now, let's use Neuter for verbs as a convention or update Lemma to make gender optional.
-                    # Rust struct has Gender, so we must provide one.
-                elif is_adj:
-                    lemma_pos = PartOfSpeech.Adjective
-                    # Adjectives usually have gender in header too, but often just {{επίθετο|el}}
-                elif is_noun:
-                    lemma_pos = PartOfSpeech.Noun
-                    if "{{ουσιαστικό|el|θηλ}}" in text or "{{θηλυκό}}" in text:
-                        lemma_gender = Gender.Feminine
-                    elif "{{ουσιαστικό|el|ουδ}}" in text or "{{ουδέτερο}}" in text:
-                        lemma_gender = Gender.Neuter
-                
-                # Parse AST
-                wikicode = mwparserfromhell.parse(text)
-                templates = wikicode.filter_templates()
-                
-                lemma_paradigm = None
-                
-                for t in templates:
-                    name = str(t.name).strip()
-                    
-                    if name.startswith("el-κλίση") or name.startswith("el-κλίσ-"):
-                        p = self.parse_inflection_template(t, lemma_gender)
-                        if p:
-                            lemma_paradigm = p
-                            paradigms[p.id] = p
-                            break # Found the inflection template
-                
-                if lemma_paradigm:
-                    # Extract Stem using Data-Driven Logic
-                    stem = self.get_stem(title, lemma_paradigm.id)
-                    
-                    # Fallback for Adjectives or complex cases if get_stem fails
-                    if not stem:
-                        # Heuristic: If it's an adjective, try removing common endings
-                        if title.endswith("ος"): stem = title[:-2]
-                        elif title.endswith("η"): stem = title[:-1]
-                        elif title.endswith("ο"): stem = title[:-1]
-                        elif title.endswith("ω"): stem = title[:-1] # Verb fallback
-                        else: stem = title # Dangerous fallback
-                    
-                    lemmas.append(Lemma(id=hash(title) % 100000, text=stem, gender=lemma_gender, pos=lemma_pos))
-                    count += 1
-                    if count % 100 == 0:
-                        print(f"✅ Processed {count} words...{title}...", end='\r')
+                    return True
+            return False
+        
+        try:
+            # Fork the workers before the reader thread starts, not while it holds locks
+            executor.submit(int).result()
+            
+            done = False
+            for batch in self.stream_batches():
+                pending.append(executor.submit(_process_batch, batch))
+                if len(pending) >= workers * 2:
+                    done = drain_one()
+                    if done:
+                        break
+            while pending and not done:
+                done = drain_one()
 
         except FileNotFoundError:
             print("⚠️  Wiktionary file not found. Skipping ingestion.")
+        finally:
+            executor.shutdown(cancel_futures=True)
             
         return lemmas, list(paradigms.values())
 
@@ -188,7 +375,7 @@ class WiktionaryParser:
         Scans the dump and counts occurrences of all inflection templates.
         """
         print(f"🕵️  Discovering templates in {self.filepath}...")
-        template_counts = {}
+        template_counts = collections.defaultdict(int)
         count = 0
         
         try:
@@ -197,13 +384,10 @@ class WiktionaryParser:
                 if "{{ουσιαστικό|el}}" not in text and "{{επίθετο|el}}" not in text and "{{ρήμα|el}}" not in text:
                     continue
 
-                wikicode = mwparserfromhell.parse(text)
-                templates = wikicode.filter_templates()
-                
-                for t in templates:
-                    name = str(t.name).strip()
+                for m in TEMPLATE_RE.finditer(text):
+                    name = m.group(1).strip()
                     if name.startswith("el-κλίση"):
-                        template_counts[name] = template_counts.get(name, 0) + 1
+                        template_counts[name] += 1
                 
                 count += 1
                 if count % 1000 == 0:
@@ -213,4 +397,4 @@ class WiktionaryParser:
         except FileNotFoundError:
             print("⚠️  File not found.")
             
-        return template_counts
+        return dict(template_counts)